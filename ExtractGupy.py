@@ -1,20 +1,67 @@
 import sqlite3
+import os
 import requests
 import google.genai as genai
-from google.genai import Client
+from google.genai import Client, types, errors
 from datetime import datetime
 import time
+import random
+import socket
 import html
-from requests.exceptions import ConnectionError, Timeout
+import re
+import hashlib
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # --- INITIAL CONFIGURATION ---
 API_URL = "https://portal.api.gupy.io/api/v1/jobs"
 client = Client(api_key="INSERT_KEY")
+GEMINI_MODEL = "gemini-2.5-flash"
+PROMPT_CACHE_TTL = 3600
+# Explicit context caching rejects content below this size (Gemini 2.5 Flash minimum)
+PROMPT_CACHE_MIN_TOKENS = 1024
+AI_MAX_OUTPUT_TOKENS = 256
+AI_TEMPERATURE = 0.2
+AI_MAX_DESCRIPTION_CHARS = 4000
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN = 120
+DEFERRED_MAX_ATTEMPTS = 5
+AI_MAX_WORKERS = 8
+AI_MAX_CONCURRENT_REQUESTS = 4
+SEARCH_MAX_WORKERS = 8
 DB_JOBS_NAME = "vagas.db"
+CLIENTS_DB_NAME = "clientes.db"
 WAIT_TIME = 300
 TELEGRAM_TOKEN = "INSERT_TOKEN"
 TELEGRAM_CHAT_ID = "INSERT_CHAT_ID"
 
+def build_session():
+    """Creates an HTTP session that keeps TCP/TLS connections alive and retries gateway errors."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+    ))
+    return session
+
+# One keep-alive session per thread (search terms and the Telegram worker run concurrently)
+_http_local = threading.local()
+
+def get_session():
+    """Returns the calling thread's HTTP session, creating it on first use."""
+    if not hasattr(_http_local, 'session'):
+        _http_local.session = build_session()
+    return _http_local.session
+
+# Single persistent connection shared by every DB helper (PRAGMAs applied in initialize_jobs_db)
+CON = sqlite3.connect(DB_JOBS_NAME, check_same_thread=False)
+# Serializes writes coming from the search term and AI worker threads
+DB_LOCK = threading.Lock()
+
 system_prompt = (
     "You are a recruitment assistant. Your task is to analyze an job vacancy description "
     "and provide a concise, high-quality summary (maximum 4 topics). "
@@ -26,6 +73,29 @@ system_prompt = (
 
 # --- TELEGRAM FUNCTION ---
 
+# Gemini greetings to drop from the summary, and Markdown bold (**text**) to convert to HTML <b>
+IGNORE_RE = re.compile(r"^(here is the concise summary|aqui está o resumo conciso)", re.IGNORECASE)
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+# A leading list marker counts only when followed by whitespace, so an opening "**" bold is kept
+LIST_MARKER_RE = re.compile(r"^\s*(?:[*•-]\s+)?")
+
+def format_summary_html(ia_summary):
+    """
+    Converts the raw Gemini summary into Telegram HTML bullets in a single pass.
+
+    Each non-empty line is stripped of list markers, skipped if it is a greeting,
+    HTML-escaped and has its Markdown bold converted to <b> tags.
+    """
+    content_lines = []
+    for line in ia_summary.split('\n'):
+        line_stripped = LIST_MARKER_RE.sub("", line).strip()
+        if not line_stripped or IGNORE_RE.search(line_stripped):
+            continue
+        line_formatted = BOLD_RE.sub(r"<b>\1</b>", html.escape(line_stripped))
+        content_lines.append(f"• {line_formatted}")
+    # Telegram's HTML mode has no <br> tag: line breaks are plain newlines
+    return "\n".join(content_lines)
+
 def send_telegram_message(message):
     """
     Sends a formatted message to Telegram.
@@ -35,7 +105,7 @@ def send_telegram_message(message):
     """
     if not message:
         return
-    url = f"https://api.telegram.com/bot{TELEGRAM_TOKEN}/sendMessage"
+    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
     payload = {
         'chat_id': TELEGRAM_CHAT_ID,
         'text': message,
@@ -43,76 +113,331 @@ def send_telegram_message(message):
         'disable_web_page_preview': True
     }
     try:
-        response = requests.post(url, data=payload)
+        response = get_session().post(url, json=payload, timeout=10)
         response.raise_for_status()
         print("   [TELEGRAM] Message sent successfully!")
     except requests.exceptions.RequestException as e:
         print(f"❌ [TELEGRAM] Error sending message to Telegram: {e}")
 
+# Messages waiting to be delivered by the background Telegram worker
+_TG_Q = queue.Queue()
+
+def _tg_worker():
+    """Delivers queued Telegram messages in order, using the worker thread's keep-alive session."""
+    while True:
+        message = _TG_Q.get()
+        try:
+            send_telegram_message(message)
+        finally:
+            _TG_Q.task_done()
+
+def start_telegram_worker():
+    """Starts the daemon thread that sends Telegram messages off the extraction loop."""
+    threading.Thread(target=_tg_worker, name="telegram-worker", daemon=True).start()
+
+def queue_telegram_message(message):
+    """Queues a message for the Telegram worker without waiting for the HTTP request."""
+    _TG_Q.put(message)
 
 # --- AI ANALYSIS FUNCTION ---
 
+# Caps in-flight Gemini requests across all worker threads to respect the API QPS
+GEMINI_SEMAPHORE = threading.BoundedSemaphore(AI_MAX_CONCURRENT_REQUESTS)
+
+# Gemini context cache holding the system prompt (recreated shortly before its TTL expires)
+_prompt_cache = {'name': None, 'expires_at': 0, 'cacheable': None}
+# Makes the expiry check and refresh atomic so concurrent AI workers create a single cache object
+_prompt_cache_lock = threading.Lock()
+
+# Circuit breaker: after CIRCUIT_FAILURE_THRESHOLD consecutive transient failures, Gemini calls are
+# skipped for CIRCUIT_COOLDOWN seconds and the job is saved with AI_DEFERRED_SUMMARY instead
+_cb = {'fails': 0, 'open_until': 0}
+# Guards _cb updates made concurrently by the AI worker threads
+_cb_lock = threading.Lock()
+AI_DEFERRED_SUMMARY = "\n[Gemini Analysis - DEFERRED. Service unavailable, analysis will be retried on a future cycle.]"
+
+def is_prompt_cacheable(client):
+    """
+    Tells whether system_prompt reaches PROMPT_CACHE_MIN_TOKENS, the minimum for explicit caching.
+
+    Counted once with count_tokens and remembered; if counting fails the prompt is treated as not
+    cacheable, so no cache creation that the API would reject is ever attempted. Call with the lock held.
+    """
+    if _prompt_cache['cacheable'] is None:
+        try:
+            total_tokens = client.models.count_tokens(model=GEMINI_MODEL, contents=system_prompt).total_tokens
+        except Exception as e:
+            print(f"   [IA CACHE]: Could not count system prompt tokens. Error: {e}")
+            total_tokens = 0
+        _prompt_cache['cacheable'] = total_tokens >= PROMPT_CACHE_MIN_TOKENS
+        if not _prompt_cache['cacheable']:
+            print(f"   [IA CACHE]: System prompt below {PROMPT_CACHE_MIN_TOKENS} tokens. Sending it inline (no context cache).")
+    return _prompt_cache['cacheable']
+
+def get_generation_config(client, use_cache=True):
+    """
+    Returns the GenerateContentConfig for Gemini calls: system prompt plus output limits.
+
+    When the prompt is large enough to be cached (is_prompt_cacheable) it is stored once in a Gemini
+    context cache and referenced by name, so it is not re-sent and re-processed on every job. Otherwise,
+    if cache creation fails, or with use_cache=False, the prompt is sent inline as system_instruction.
+
+    Output is capped at AI_MAX_OUTPUT_TOKENS (the summary has at most 4 topics) and thinking is
+    disabled, since on 2.5 models thinking tokens would otherwise consume that budget and add latency.
+    """
+    cache_name = None
+    if use_cache:
+        with _prompt_cache_lock:
+            # Re-checked under the lock: another worker may have just refreshed the cache
+            if is_prompt_cacheable(client) and time.time() >= _prompt_cache['expires_at']:
+                try:
+                    cached = client.caches.create(
+                        model=GEMINI_MODEL,
+                        config=types.CreateCachedContentConfig(
+                            system_instruction=system_prompt,
+                            ttl=f"{PROMPT_CACHE_TTL}s",
+                        ),
+                    )
+                    _prompt_cache['name'] = cached.name
+                    print(f"   [IA CACHE]: System prompt cached as {cached.name}.")
+                except Exception as e:
+                    _prompt_cache['name'] = None
+                    print(f"   [IA CACHE]: Context cache unavailable, sending system prompt inline. Error: {e}")
+                # Refresh a minute early so a request never references an expired cache
+                _prompt_cache['expires_at'] = time.time() + PROMPT_CACHE_TTL - 60
+            cache_name = _prompt_cache['name']
+
+    output_config = dict(
+        max_output_tokens=AI_MAX_OUTPUT_TOKENS,
+        temperature=AI_TEMPERATURE,
+        response_mime_type="text/plain",
+        thinking_config=types.ThinkingConfig(thinking_budget=0),
+    )
+    if cache_name:
+        return types.GenerateContentConfig(cached_content=cache_name, **output_config)
+    return types.GenerateContentConfig(system_instruction=system_prompt, **output_config)
+
+def invalidate_prompt_cache(cache_name):
+    """Forgets a context cache the server no longer has, so the next call recreates it."""
+    with _prompt_cache_lock:
+        if _prompt_cache['name'] == cache_name:
+            _prompt_cache['name'] = None
+            _prompt_cache['expires_at'] = 0
+
+def generate_summary(client, full_description):
+    """
+    Sends one generate_content request for the description.
+
+    If the referenced context cache has expired or been evicted server-side (a 4xx mentioning the
+    cache), the cache is dropped and the request is retried once with the prompt inline.
+    """
+    config = get_generation_config(client)
+    try:
+        with GEMINI_SEMAPHORE:
+            return client.models.generate_content(model=GEMINI_MODEL, contents=[full_description], config=config)
+    except errors.ClientError as e:
+        if not config.cached_content or 'cache' not in str(e).lower():
+            raise
+        print(f"           [IA CACHE]: Context cache {config.cached_content} is gone. Retrying with the prompt inline.")
+        invalidate_prompt_cache(config.cached_content)
+
+    inline_config = get_generation_config(client, use_cache=False)
+    with GEMINI_SEMAPHORE:
+        return client.models.generate_content(model=GEMINI_MODEL, contents=[full_description], config=inline_config)
+
+def is_recoverable_error(error):
+    """
+    Tells whether a Gemini failure is worth retrying.
+
+    Server errors (5xx), rate limiting (429), timeouts and connection problems are transient.
+    Any other client error (invalid key, permission, bad request) is permanent and fails fast.
+    """
+    if isinstance(error, errors.ClientError):
+        return error.code in (408, 429)
+    return True
+
 def analyze_job_with_ai(client, full_description):
     """
-    Uses Gemini to summarize the job description with up to 3 retries (Exponential Backoff).
+    Uses Gemini to summarize the job description with up to 3 retries (Exponential Backoff with jitter).
 
     This function implements a retry mechanism to handle transient API errors (like 503 UNAVAILABLE),
-    ensuring resilience in the job monitoring process.
+    ensuring resilience in the job monitoring process. The random jitter keeps parallel workers from
+    retrying in lockstep, and unrecoverable errors are not retried at all.
+
+    While the circuit breaker is open the call is skipped and AI_DEFERRED_SUMMARY is returned.
     """
     MAX_RETRIES = 3
     for attempt in range(MAX_RETRIES):
+        if time.time() < _cb['open_until']:
+            print("           [IA CIRCUIT OPEN]: Gemini unavailable. Analysis deferred.")
+            return AI_DEFERRED_SUMMARY
+
         try:
-            response = client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=[system_prompt, full_description],
-            )
+            response = generate_summary(client, full_description)
+            with _cb_lock:
+                _cb['fails'] = 0
+            if not response.text:
+                # No text part (e.g. safety block or output cut at max_output_tokens)
+                return "\n[Gemini Analysis - EMPTY RESPONSE. The model returned no text for this description.]"
             return response.text
 
         except Exception as e:
             error_message = str(e)
 
-            if "503 UNAVAILABLE" in error_message or attempt == MAX_RETRIES - 1:
-                print(f"           [IA ERROR]: Failure on attempt {attempt + 1}. Error: {error_message}")
-                if attempt == MAX_RETRIES - 1:
-                    return f"\n[Gemini Analysis - CRITICAL FAILURE after {MAX_RETRIES} attempts. Service unavailable: {error_message}]"
+            print(f"           [IA ERROR]: Failure on attempt {attempt + 1}. Error: {error_message}")
+
+            if not is_recoverable_error(e):
+                return f"\n[Gemini Analysis - UNRECOVERABLE FAILURE. Not retrying: {error_message}]"
+
+            with _cb_lock:
+                _cb['fails'] += 1
+                consecutive_fails = _cb['fails']
+                if consecutive_fails >= CIRCUIT_FAILURE_THRESHOLD:
+                    _cb['open_until'] = time.time() + CIRCUIT_COOLDOWN
+            if consecutive_fails >= CIRCUIT_FAILURE_THRESHOLD:
+                print(f"           [IA CIRCUIT OPEN]: {consecutive_fails} consecutive failures. Skipping Gemini for {CIRCUIT_COOLDOWN}s.")
+                return AI_DEFERRED_SUMMARY
 
-            sleep_time = 2 ** attempt
-            print(f"           [IA RETRY]: Model overloaded (503). Waiting {sleep_time}s before retrying...")
+            if attempt == MAX_RETRIES - 1:
+                return f"\n[Gemini Analysis - CRITICAL FAILURE after {MAX_RETRIES} attempts. Service unavailable: {error_message}]"
+
+            sleep_time = min(30, (2 ** attempt) * (1 + random.random() * 0.5))
+            print(f"           [IA RETRY]: Transient error. Waiting {sleep_time:.1f}s before retrying...")
             time.sleep(sleep_time)
 
     return "\n[Gemini Analysis - UNEXPECTED FAILURE. Try again later.]"
 
+TAG_RE = re.compile(r"<[^>]+>")
+
+def clean_description(full_description):
+    """
+    Strips HTML tags and entities from a Gupy description and collapses whitespace.
+
+    A missing (None) description becomes an empty string.
+    """
+    cleaned = html.unescape(TAG_RE.sub(" ", full_description or ""))
+    return " ".join(cleaned.split())
+
+def analyze_job_cached(client, full_description):
+    """
+    Returns the Gemini summary for a description, reusing a previous analysis when possible.
+
+    The description is cleaned first (clean_description). Summaries are stored in the 'ia_cache' table
+    keyed by the SHA-256 of the full cleaned text, so a job republished (even with markup or whitespace
+    changes) or found under several search terms is only analyzed once. Failures are not cached.
+
+    Only the first AI_MAX_DESCRIPTION_CHARS characters are sent to Gemini: enough for a 4-topic summary
+    while keeping the prompt (and its latency) small. The cache key is computed before truncating so
+    postings that share a long templated opening do not collide.
+    """
+    full_description = clean_description(full_description)
+    desc_sha256 = hashlib.sha256(full_description.encode('utf-8')).hexdigest()
+    row = CON.execute("SELECT summary FROM ia_cache WHERE desc_sha256 = ?", (desc_sha256,)).fetchone()
+    if row:
+        print("    [AI CACHE]: Description already analyzed. Reusing cached summary.")
+        return row[0]
+
+    ia_summary = analyze_job_with_ai(client, full_description[:AI_MAX_DESCRIPTION_CHARS])
+    if not ia_summary.startswith("\n[Gemini Analysis"):
+        with DB_LOCK, CON:
+            CON.execute("INSERT OR IGNORE INTO ia_cache (desc_sha256, summary) VALUES (?, ?)", (desc_sha256, ia_summary))
+    return ia_summary
+
+def resolve_deferred_job(gupy_id, search_title, ia_summary):
+    """Writes the final summary (or failure) of a deferred job to 'found_jobs' and removes it from the queue."""
+    with DB_LOCK, CON:
+        CON.execute("UPDATE found_jobs SET ia_summary = ? WHERE gupy_id = ? AND search_title = ?", (ia_summary, gupy_id, search_title))
+        CON.execute("DELETE FROM deferred_jobs WHERE gupy_id = ? AND search_title = ?", (gupy_id, search_title))
+
+def retry_deferred_analyses(client):
+    """
+    Re-analyzes jobs that were saved with AI_DEFERRED_SUMMARY while the circuit breaker was open.
+
+    Successful summaries replace the placeholder in 'found_jobs', the pending entry is removed and a
+    follow-up Telegram message delivers the summary (the original alert went out with the placeholder).
+    Only transient failures keep a job queued: the breaker reopening (not counted) or a CRITICAL
+    failure, which counts as an attempt and stops this pass since the service is struggling. After
+    DEFERRED_MAX_ATTEMPTS, or on a permanent failure (unrecoverable error, empty response), the
+    failure text is saved as the summary and the job leaves the queue.
+    """
+    if time.time() < _cb['open_until']:
+        return
+
+    pending = CON.execute("SELECT gupy_id, search_title, description, attempts FROM deferred_jobs").fetchall()
+    if not pending:
+        return
+
+    print(f"🔁 [AI DEFERRED]: Retrying {len(pending)} deferred analysis(es)...")
+    for gupy_id, search_title, description, attempts in pending:
+        ia_summary = analyze_job_cached(client, description)
+        if ia_summary == AI_DEFERRED_SUMMARY:
+            print("    [AI DEFERRED]: Gemini still unavailable. Remaining analyses kept for the next cycle.")
+            return
+
+        if ia_summary.startswith("\n[Gemini Analysis - CRITICAL FAILURE"):
+            attempts += 1
+            if attempts >= DEFERRED_MAX_ATTEMPTS:
+                resolve_deferred_job(gupy_id, search_title, ia_summary)
+                print(f"    [AI DEFERRED]: Job {gupy_id} ('{search_title}') failed {attempts} times. Giving up.")
+            else:
+                with DB_LOCK, CON:
+                    CON.execute("UPDATE deferred_jobs SET attempts = ? WHERE gupy_id = ? AND search_title = ?", (attempts, gupy_id, search_title))
+                print(f"    [AI DEFERRED]: Job {gupy_id} ('{search_title}') failed again (attempt {attempts}/{DEFERRED_MAX_ATTEMPTS}). Remaining analyses kept for the next cycle.")
+            return
+
+        if ia_summary.startswith("\n[Gemini Analysis"):
+            resolve_deferred_job(gupy_id, search_title, ia_summary)
+            print(f"    [AI DEFERRED]: Job {gupy_id} ('{search_title}') failed permanently. Removed from the queue.")
+            continue
+
+        resolve_deferred_job(gupy_id, search_title, ia_summary)
+        print(f"   [AI DEFERRED] Job {gupy_id} ('{search_title}') summary updated.")
+
+        job = CON.execute(
+            "SELECT job_name, work_model, job_url FROM found_jobs WHERE gupy_id = ? AND search_title = ?",
+            (gupy_id, search_title)
+        ).fetchone()
+        if job:
+            job_name, work_model, job_url = job
+            queue_telegram_message(
+                f"📝 <b>AI SUMMARY AVAILABLE (GUPY)</b>\n\n"
+                f"<b>Search:</b> {html.escape(search_title)}\n\n"
+                f"<b>Job:</b> <a href='{job_url}'>{html.escape(job_name)}</a>\n"
+                f"<b>Location:</b> {html.escape(work_model or '')}\n\n"
+                f"<b>Summary:</b>\n{format_summary_html(ia_summary)}"
+            )
+
 # --- DB FUNCTIONS ---
 
-def check_network_connection(timeout_s=10):
+def check_network_connection(timeout_s=5):
     """
-    Checks network connectivity with a reliable endpoint (Google).
+    Checks network connectivity by opening a TCP connection to a reliable endpoint (Cloudflare DNS).
 
+    A plain socket connect avoids the DNS lookup and TLS handshake of an HTTPS request.
     Crucial for QA and maintaining the system's operational resilience.
     """
     try:
-        requests.get("https://www.google.com", timeout=timeout_s)
+        socket.create_connection(("1.1.1.1", 53), timeout=timeout_s).close()
         return True
-    except (ConnectionError, Timeout):
+    except OSError:
         print("❌ [NETWORK] No network connection. System waiting.")
         return False
 
-def clear_jobs_db():
-    """Performs a Hard Reset, deleting all content from the found_jobs table."""
-    try:
-        con = sqlite3.connect(DB_JOBS_NAME)
-        cur = con.cursor()
-        cur.execute("DELETE FROM found_jobs")
-        con.commit()
-        con.close()
-        print("✅ [DB - HARD RESET] Table 'found_jobs' successfully cleared.")
-    except sqlite3.Error as e:
-        print(f"❌ [DB FATAL] Error clearing the database: {e}")
-
 def initialize_jobs_db():
-    """Initializes the SQLite database, creating the 'found_jobs' table with a composite primary key."""
-    con = sqlite3.connect(DB_JOBS_NAME)
-    cur = con.cursor()
+    """
+    Initializes the SQLite database, creating the 'found_jobs' table (WITHOUT ROWID) with a composite
+    primary key and a (search_title, gupy_id) index for the per-term lookups, plus the 'ia_cache'
+    table of Gemini summaries keyed by description hash and the 'deferred_jobs' queue of descriptions
+    whose analysis was skipped by the circuit breaker, and the per-term 'search_state' paging state.
+
+    Also applies the connection-wide PRAGMAs (WAL journal, relaxed fsync, in-memory temp store
+    and a larger page cache) once, so every later helper reuses the tuned connection.
+    """
+    cur = CON.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA cache_size=-20000")
     cur.execute("""
         CREATE TABLE IF NOT EXISTS found_jobs (
             gupy_id INTEGER NOT NULL,
@@ -124,60 +449,165 @@ def initialize_jobs_db():
             ia_summary TEXT,
             extraction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             PRIMARY KEY (gupy_id, search_title)
-        )
+        ) WITHOUT ROWID
+    """)
+    # Per-term lookups filter on search_title first, which the (gupy_id, search_title) PK can't seek
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_search ON found_jobs (search_title, gupy_id)")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS ia_cache (
+            desc_sha256 TEXT PRIMARY KEY,
+            summary TEXT NOT NULL
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS deferred_jobs (
+            gupy_id INTEGER NOT NULL,
+            search_title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (gupy_id, search_title)
+        ) WITHOUT ROWID
     """)
-    con.commit()
-    con.close()
-
-def has_search_term_data(search_title):
-    """Checks if there is any data saved for a specific search term."""
-    con = sqlite3.connect(DB_JOBS_NAME)
-    cur = con.cursor()
-    cur.execute("SELECT 1 FROM found_jobs WHERE search_title = ? LIMIT 1", (search_title,))
-    exists = cur.fetchone() is not None
-    con.close()
-    return exists
-
-def check_job_exists(gupy_id, search_title):
-    """
-    Checks if the job has already been analyzed and saved IN THE DB FOR THIS SPECIFIC TERM.
-
-    Uses the composite key (gupy_id, search_title) to prevent re-notifying for the same job under the same search.
-    """
-    con = sqlite3.connect(DB_JOBS_NAME)
-    cur = con.cursor()
-    cur.execute("SELECT 1 FROM found_jobs WHERE gupy_id = ? AND search_title = ?", (gupy_id, search_title))
-    exists = cur.fetchone() is not None
-    con.close()
-    return exists
-
-def save_job_to_db(data):
-    """Saves or updates a job record in the database using REPLACE INTO."""
-    con = sqlite3.connect(DB_JOBS_NAME)
-    cur = con.cursor()
+    # Queues created before the retry counter existed
+    if 'attempts' not in [column[1] for column in cur.execute("PRAGMA table_info(deferred_jobs)")]:
+        cur.execute("ALTER TABLE deferred_jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS search_state (
+            search_title TEXT PRIMARY KEY,
+            last_seen_published_at TEXT NOT NULL
+        ) WITHOUT ROWID
+    """)
+    CON.commit()
+
+def get_saved_job_ids(search_title):
+    """
+    Returns the set of gupy_ids already saved IN THE DB FOR THIS SPECIFIC TERM.
+
+    Loaded once per search term so the duplicate check in search_job is an in-memory lookup
+    instead of one SELECT per job (composite key (gupy_id, search_title)). An empty set
+    means the term has no data yet (Initial Population mode).
+    """
+    cur = CON.cursor()
+    cur.execute("SELECT gupy_id FROM found_jobs WHERE search_title = ?", (search_title,))
+    return {row[0] for row in cur.fetchall()}
+
+def save_jobs_to_db(rows):
+    """Saves or updates a page of job records with a single REPLACE INTO batch and one commit."""
+    if not rows:
+        return
+    try:
+        with DB_LOCK, CON:
+            CON.executemany("""
+                REPLACE INTO found_jobs (
+                    gupy_id, search_title, job_name, work_model,
+                    publish_date, job_url, ia_summary
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        print(f"   [DB] {len(rows)} job(s) saved/updated successfully.")
+    except sqlite3.Error as e:
+        print(f"❌ [DB] Error saving jobs: {e}")
+
+def save_deferred_jobs(rows):
+    """Queues (gupy_id, search_title, description) records whose AI analysis was deferred."""
+    if not rows:
+        return
+    try:
+        with DB_LOCK, CON:
+            CON.executemany("REPLACE INTO deferred_jobs (gupy_id, search_title, description) VALUES (?, ?, ?)", rows)
+        print(f"   [DB] {len(rows)} job(s) queued for deferred AI analysis.")
+    except sqlite3.Error as e:
+        print(f"❌ [DB] Error queuing deferred jobs: {e}")
+
+def get_last_seen_published_at(search_title):
+    """Returns the newest raw Gupy publishedDate saved for a search term, or None."""
+    row = CON.execute("SELECT last_seen_published_at FROM search_state WHERE search_title = ?", (search_title,)).fetchone()
+    return row[0] if row else None
+
+def save_last_seen_published_at(search_title, published_dates):
+    """Advances the term's last_seen_published_at to the newest of the given ISO dates (never moves back)."""
+    published_dates = [d for d in published_dates if d]
+    if not published_dates:
+        return
     try:
-        cur.execute("""
-            REPLACE INTO found_jobs (
-                gupy_id, search_title, job_name, work_model,
-                publish_date, job_url, ia_summary
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, data)
-        con.commit()
-        print(f"   [DB] Job {data[0]} saved/updated successfully.")
+        with DB_LOCK, CON:
+            CON.execute("""
+                INSERT INTO search_state (search_title, last_seen_published_at) VALUES (?, ?)
+                ON CONFLICT (search_title) DO UPDATE SET
+                    last_seen_published_at = max(last_seen_published_at, excluded.last_seen_published_at)
+            """, (search_title, max(published_dates)))
     except sqlite3.Error as e:
-        print(f"❌ [DB] Error saving job: {e}")
-    finally:
-        con.close()
+        print(f"❌ [DB] Error saving search state: {e}")
 
 # --- CLIENT EXTRACTION ---
-con = sqlite3.connect("clientes.db")
-cur = con.cursor()
-cur.execute("SELECT id, role FROM cliente")
-result = cur.fetchall()
-con.close()
+
+# Last loaded client list and the clientes.db modification time it was read at
+_clients_cache = {'mtime': None, 'clients': []}
+
+def load_clients():
+    """
+    Loads the (id, role) search terms from the 'cliente' table, ordered by id.
+
+    The deterministic order keeps the duplicate-stop behavior stable across cycles. The query only
+    runs again when clientes.db changes on disk, so terms can be edited without restarting the monitor.
+    """
+    mtime = os.path.getmtime(CLIENTS_DB_NAME)
+    if mtime != _clients_cache['mtime']:
+        con = sqlite3.connect(CLIENTS_DB_NAME)
+        try:
+            clients = con.execute("SELECT id, role FROM cliente ORDER BY id").fetchall()
+        finally:
+            con.close()
+        _clients_cache['mtime'] = mtime
+        _clients_cache['clients'] = clients
+        print(f"📋 [CLIENTS] {len(clients)} search term(s) loaded from '{CLIENTS_DB_NAME}'.")
+    return _clients_cache['clients']
 
 # --- SEARCH_JOB (QA FLOW AND EXECUTION CONTROL) ---
 
+def format_published_date(date_raw):
+    """
+    Formats Gupy's ISO publishedDate ("YYYY-MM-DDTHH:MM:SS.sssZ") as "DD/MM/YYYY".
+
+    The date part is sliced directly, avoiding a datetime object per job; anything that does not look
+    like an ISO date falls back to fromisoformat, and unparseable values are returned unchanged.
+    """
+    if date_raw and len(date_raw) >= 10 and date_raw[4] == '-' and date_raw[7] == '-':
+        return f"{date_raw[8:10]}/{date_raw[5:7]}/{date_raw[0:4]}"
+    try:
+        return datetime.fromisoformat(date_raw.replace('Z', '+00:00')).strftime("%d/%m/%Y")
+    except Exception:
+        return date_raw
+
+def has_new_jobs(search_title, saved_ids):
+    """
+    Cheaply checks whether a monitored term may have new jobs before paginating.
+
+    Runs once the term has paging state (last_seen_published_at). Fetches only the newest job (limit=1):
+    if its id is already saved there is nothing new, the same test the regular flow applies to the
+    first job. The date is not used to decide, since a new job can share the last seen publishedDate
+    or be listed out of date order. Any doubt (request error, empty result) returns True so the
+    regular flow handles it.
+    """
+    last_seen = get_last_seen_published_at(search_title)
+    if not last_seen:
+        return True
+
+    try:
+        r = get_session().get(
+            API_URL,
+            params={"jobName": search_title, "limit": 1, "offset": 0},
+            timeout=15
+        )
+        r.raise_for_status()
+        latest_jobs = r.json().get('data', [])
+    except (requests.exceptions.RequestException, ValueError):
+        return True
+
+    if not latest_jobs:
+        return True
+
+    return latest_jobs[0].get('id') not in saved_ids
+
 def search_job(search_id, search_title):
     """
     Fetches job vacancies from the Gupy API based on the search title.
@@ -185,22 +615,30 @@ def search_job(search_id, search_title):
     Manages two main execution modes:
     1. Initial population (saves the first page, no notification).
     2. Continuous monitoring (checks all pages until a duplicate is found, sends notifications).
+       Idle terms are detected with a single-job probe (has_new_jobs) and skip pagination entirely.
     """
     offset = 0
+    page_num = 1
     limit = 10
     jobs_per_page = 10
 
-    is_first_run = not has_search_term_data(search_title)
+    saved_ids = get_saved_job_ids(search_title)
+    is_first_run = len(saved_ids) == 0
 
     execution_mode = "Initial Run (1st Page Only - No Notification)" if is_first_run else "Continuous Monitoring (Until Duplication - With Notification)"
     print(f"[Mode] {execution_mode}")
 
+    # --- IDLE TERM SHORT-CIRCUIT (Continuous Monitoring Mode) ---
+    if not is_first_run and not has_new_jobs(search_title, saved_ids):
+        print(f"✅ No new jobs for '{search_title}' since the last cycle. Skipping pagination.")
+        return
+
     while True:
 
-        print(f"\n🔄 Consulting page: {int(offset/limit) + 1} for '{search_title}'...")
+        print(f"\n🔄 Consulting page: {page_num} for '{search_title}'...")
 
         try:
-            r = requests.get(
+            r = get_session().get(
                 API_URL,
                 params={
                     "jobName": search_title,
@@ -229,19 +667,58 @@ def search_job(search_id, search_title):
             time.sleep(WAIT_TIME)
             return
 
-        new_jobs_found = 0
+        stop_search = False
+        new_jobs = []
+        page_rows = []
+        page_messages = []
+        page_deferred = []
 
         for job_data in job_list:
             gupy_id = job_data.get('id')
 
             # --- DUPLICATE STOP CRITERION (Continuous Monitoring Mode) ---
-            if not is_first_run and check_job_exists(gupy_id, search_title):
+            if not is_first_run and gupy_id in saved_ids:
                 print(f"⛔ Job ID {gupy_id} ('{job_data.get('name')}') already exists for the term '{search_title}'. Immediate stop...")
-                return
+                stop_search = True
+                break
 
-            # --- PROCESSING AND SAVING ---
-            new_jobs_found += 1
+            new_jobs.append(job_data)
 
+            # --- STOP CRITERION IN 1ST RUN AFTER 1ST PAGE ---
+            if is_first_run and len(new_jobs) >= jobs_per_page:
+                stop_search = True
+                break
+
+        new_jobs_found = len(new_jobs)
+
+        # --- CONDITIONAL AI CALL (QA ENHANCEMENT) ---
+        summaries = []
+        if is_first_run:
+            print("    [AI]: INITIAL POPULATION MODE ACTIVE. AI analysis IGNORED.")
+            summaries = ["[AI analysis ignored in Initial Population mode]"] * new_jobs_found
+        elif new_jobs:
+            print(f"    [AI]: MONITORING MODE ACTIVE. Sending {new_jobs_found} job(s) for AI analysis...")
+            # Descriptions are only read in monitoring mode; Initial Population never touches them.
+            # Any future per-job detail request (full description) must stay behind this same gate.
+            # `or` also covers an explicit "description": null in the API response
+            descriptions = [job_data.get('description') or 'Description not provided.' for job_data in new_jobs]
+            # Identical descriptions on the same page are analyzed only once
+            unique_descriptions = list(dict.fromkeys(descriptions))
+            with ThreadPoolExecutor(max_workers=AI_MAX_WORKERS) as executor:
+                unique_summaries = list(executor.map(lambda d: analyze_job_cached(client, d), unique_descriptions))
+            summary_by_description = dict(zip(unique_descriptions, unique_summaries))
+            summaries = [summary_by_description[d] for d in descriptions]
+            page_deferred = [
+                (job_data.get('id'), search_title, description)
+                for job_data, description, ia_summary in zip(new_jobs, descriptions, summaries)
+                if ia_summary == AI_DEFERRED_SUMMARY
+            ]
+        # ----------------------------------------------------
+
+        for job_data, ia_summary in zip(new_jobs, summaries):
+            gupy_id = job_data.get('id')
+
+            # --- PROCESSING AND SAVING ---
             workplace_type = job_data.get('workplaceType')
             if workplace_type == 'remote':
                 work_model = "Remote"
@@ -254,23 +731,7 @@ def search_job(search_id, search_title):
                 else:
                     work_model = f'Onsite - {city} - {state}'
 
-            description = job_data.get('description', 'Description not provided.')
-
-            # --- CONDITIONAL AI CALL (QA ENHANCEMENT) ---
-            if is_first_run:
-                print("    [AI]: INITIAL POPULATION MODE ACTIVE. AI analysis IGNORED.")
-                ia_summary = "[AI analysis ignored in Initial Population mode]"
-            else:
-                print("    [AI]: MONITORING MODE ACTIVE. Sending for AI analysis...")
-                ia_summary = analyze_job_with_ai(client, description)
-            # ----------------------------------------------------
-
-            date_raw = job_data.get('publishedDate')
-            try:
-                date_obj = datetime.fromisoformat(date_raw.replace('Z', '+00:00'))
-                formatted_date = date_obj.strftime("%d/%m/%Y")
-            except Exception:
-                formatted_date = date_raw
+            formatted_date = format_published_date(job_data.get('publishedDate'))
 
             db_record = (
                 gupy_id,
@@ -282,50 +743,28 @@ def search_job(search_id, search_title):
                 ia_summary
             )
 
-            save_job_to_db(db_record)
+            page_rows.append(db_record)
 
-            # --- MESSAGE CONSTRUCTION AND SENDING ---
+            # --- MESSAGE CONSTRUCTION (SENT AFTER THE PAGE IS COMMITTED) ---
 
             if not is_first_run:
 
                 link_vaga = job_data.get('jobUrl')
 
-                # 1. Prepare AI summary content (clean up Gemini's possible greeting and format bullets)
-                lines = ia_summary.split('\n')
-                content_lines = []
-                is_content_started = False
+                # 1. Prepare AI summary content (drop Gemini's possible greeting and format bullets)
+                final_resumo_formatado = format_summary_html(ia_summary)
 
-                for line in lines:
-                    line_stripped = line.lstrip().lstrip('*').lstrip('•').strip()
-
-                    if any(phrase in line_stripped for phrase in ["Here is the concise summary", "Aqui está o resumo conciso"]):
-                        continue
-
-                    if line_stripped:
-                        is_content_started = True
-
-                    if is_content_started and line_stripped:
-                        # Replace Markdown bold (**) with HTML <b>
-                        line_formatted = line_stripped.replace('**', '<b>').replace('<b><b>', '')
-
-                        content_lines.append(f"• {line_formatted}")
-
-                # 2. Join lines, escape HTML special characters, and convert newlines to <br>
-                final_resumo_formatado = "\n".join(content_lines)
-                final_resumo_formatado = html.escape(final_resumo_formatado).replace('\n', '<br>')
-                final_resumo_formatado = final_resumo_formatado.replace('&lt;br&gt;', '<br>').replace('&lt;b&gt;', '<b>').replace('&lt;/b&gt;', '</b>')
-
-                # 3. Construct the final message using HTML tags
+                # 2. Construct the final message using HTML tags
                 message = (
                     f"🚨 <b>ALERT: NEW JOB FOUND (GUPY)!</b> 🚨\n\n"
                     f"<b>Search:</b> {html.escape(search_title)}\n\n"
                     f"<b>Job:</b> <a href='{link_vaga}'>{html.escape(job_data.get('name'))}</a>\n"
                     f"<b>Company:</b> {html.escape(job_data.get('careerPageName'))}\n"
                     f"<b>Location:</b> {html.escape(work_model)}\n\n"
-                    f"<b>Summary:</b><br>{final_resumo_formatado}"
+                    f"<b>Summary:</b>\n{final_resumo_formatado}"
                 )
 
-                send_telegram_message(message)
+                page_messages.append(message)
 
             # Console output
             print(f" - Job ID: {gupy_id}, Title: {job_data.get('name')}")
@@ -334,17 +773,35 @@ def search_job(search_id, search_title):
             print(f" - **Quality Summary (Gemini):**{ia_summary}\n")
             print("--------------------------------------------------")
 
-            # --- STOP CRITERION IN 1ST RUN AFTER 1ST PAGE ---
-            if is_first_run and new_jobs_found >= jobs_per_page:
+        # --- PAGE PERSISTENCE AND NOTIFICATION ---
+        save_jobs_to_db(page_rows)
+        saved_ids.update(row[0] for row in page_rows)
+        save_deferred_jobs(page_deferred)
+        # Seeded from the page's first job too, so idle terms (no new jobs) still get paging state
+        save_last_seen_published_at(search_title, [job_data.get('publishedDate') for job_data in [job_list[0]] + new_jobs])
+
+        for message in page_messages:
+            queue_telegram_message(message)
+
+        if stop_search:
+            if is_first_run:
                 print(f"✅ Initial run for '{search_title}' complete. 1st page saved ({new_jobs_found} jobs).")
-                return
+            return
 
         # --- PAGINATION LOGIC (ONLY CONTINUOUS MODE) ---
         if not is_first_run and new_jobs_found < jobs_per_page:
-            print(f"✅ Page {int(offset/limit) + 1} processing finished. All recent jobs were saved.")
+            print(f"✅ Page {page_num} processing finished. All recent jobs were saved.")
             return
 
         offset += limit
+        page_num += 1
+
+def run_search(query):
+    """Runs search_job for one (id, role) row from the 'cliente' table (used by the term thread pool)."""
+    search_id = query[0]
+    search_title = query[1]
+    print(f"\n[CLIENT ID: {search_id}] Searching for: **{search_title}**")
+    search_job(search_id, search_title)
 
 # --- MAIN EXECUTION (CONTROL LOOP WITH NETWORK RESILIENCE) ---
 if __name__ == "__main__":
@@ -352,41 +809,39 @@ if __name__ == "__main__":
     The main control loop for the job monitor.
 
     It initializes the DB and runs an infinite loop that includes:
-    1. Network QA check and resilience loop.
-    2. Conditional Hard Reset (contingency) if a network failure was detected.
-    3. Iteration over all search terms, calling search_job for each.
+    1. Network QA check and resilience loop (monitoring simply resumes once the connection is back;
+       the duplicate check makes re-extraction idempotent, so no DB reset is needed).
+    2. Concurrent iteration over all search terms, calling search_job for each.
+    3. Retry of AI analyses deferred by the Gemini circuit breaker.
     4. A wait period defined by WAIT_TIME.
     """
     initialize_jobs_db()
+    start_telegram_worker()
 
     while True:
-        network_failure = False
-
         # STEP 1: NETWORK CHECK AND WAITING LOOP (RESILIENCE)
         if not check_network_connection():
             print(f"❌ [NETWORK QA]: Connection lost. Starting wait loop ({time.strftime('%H:%M:%S')}).")
-            network_failure = True
 
             while not check_network_connection(timeout_s=30):
                 print("    ... Network unavailable. Waiting 60 seconds before rechecking.")
                 time.sleep(60)
 
-            print("✅ [NETWORK QA]: Connection RESTORED. Applying contingency.")
-
-        # STEP 2: CONDITIONAL DB CLEANUP (CONTINGENCY)
-        if network_failure:
-            print("💣 [CONTINGENCY]: Clearing DB (Hard Reset) to force re-extraction and repopulation.")
-            clear_jobs_db()
+            print("✅ [NETWORK QA]: Connection RESTORED. Resuming monitoring.")
 
         print(f"\n==================================================")
         print(f"🚀 STARTING EXTRACTION CYCLE: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
         print(f"==================================================")
 
-        for query in result:
-            search_id = query[0]
-            search_title = query[1]
-            print(f"\n[CLIENT ID: {search_id}] Searching for: **{search_title}**")
-            search_job(search_id, search_title)
+        clients = load_clients()
+
+        # Search terms are independent and I/O bound, so they are processed in parallel
+        if clients:
+            with ThreadPoolExecutor(max_workers=min(SEARCH_MAX_WORKERS, len(clients))) as executor:
+                list(executor.map(run_search, clients))
+
+        # STEP 2: RETRY AI ANALYSES DEFERRED DURING A GEMINI OUTAGE
+        retry_deferred_analyses(client)
 
         print(f"\n💤 All clients processed. System waiting for {WAIT_TIME} seconds...")
 